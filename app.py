@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import io
 import math
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Callable, Optional
 
 import pandas as pd
 import streamlit as st
 
 DOCS_DIR = Path(__file__).parent / "docs"
+_INV_TWO_PI = 1.0 / (2.0 * math.pi)
 
 from uwr_wristband import APP_VERSION, GENERATOR_VERSION
 from uwr_wristband.defaults import (
@@ -16,13 +21,15 @@ from uwr_wristband.defaults import (
     MAX_CIRCUMFERENCE,
     MAX_TEXT_LENGTH,
     MIN_CIRCUMFERENCE,
+    MIN_SAMPLES_PER_WIGGLE,
     QUALITY_PRESETS,
     SIZE_PRESETS,
 )
 from uwr_wristband.generator import (
     assemble_grid_steps,
     build_params,
-    generate_gcode_string,
+    preview_num_points,
+    write_gcode,
 )
 from uwr_wristband.logo import render_logo_svg
 from uwr_wristband.stl_export import generate_stl_export
@@ -80,9 +87,120 @@ st.warning(
 # ---------------------------------------------------------------------------
 # Printer options (cached)
 # ---------------------------------------------------------------------------
-printer_options = get_all_printer_options()
-printer_labels = [p[0] for p in printer_options]
-printer_name_map = {p[0]: p[1] for p in printer_options}
+@st.cache_data(show_spinner=False)
+def _printer_maps() -> tuple[list[str], dict[str, str]]:
+    """Return the printer selectbox labels and a label → fc name lookup."""
+    opts = get_all_printer_options()
+    return [p[0] for p in opts], {p[0]: p[1] for p in opts}
+
+
+printer_labels, printer_name_map = _printer_maps()
+
+# ---------------------------------------------------------------------------
+# Cached generation
+# ---------------------------------------------------------------------------
+def _freeze(value):
+    """Recursively convert dicts / lists into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _params_key(params: dict) -> tuple:
+    """Return a hashable key that identifies a params dict by value."""
+    return _freeze(params)
+
+
+# Params that only reach the G-code transform, not the steps list.
+_GCODE_ONLY_PARAMS = frozenset(
+    {"printer_name", "nozzle_temp", "bed_temp", "design_name"}
+)
+
+# Steps lists kept per session: one at G-code density, one at preview
+# density.  A 9-band, 100k-point grid is several hundred MB of steps.
+_STEPS_CACHE_SIZE = 2
+
+
+def _steps_key(params: dict) -> tuple:
+    """Return a hashable key over the params that shape the steps list."""
+    return _freeze(
+        {k: v for k, v in params.items() if k not in _GCODE_ONLY_PARAMS}
+    )
+
+
+def _cached_assemble(
+    params: dict,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> list:
+    """``assemble_grid_steps`` memoised per session on ``_steps_key``.
+
+    Kept in ``st.session_state`` rather than ``st.cache_resource``: the
+    progress callback drives a Streamlit element, which a cached function
+    must not touch, and only the last ``_STEPS_CACHE_SIZE`` lists are held.
+    The returned list is shared and must not be mutated; the progress
+    callback only fires on a cache miss.
+    """
+    cache = st.session_state.steps_cache
+    key = _steps_key(params)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    steps = assemble_grid_steps(params, progress_callback=progress_callback)
+    cache[key] = steps
+    while len(cache) > _STEPS_CACHE_SIZE:
+        cache.popitem(last=False)
+    return steps
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _cached_preview_figure(
+    params_key: tuple, EW: float, EH: float, _steps: list
+):
+    """Memoised ``generate_preview_figure`` keyed on *params_key*.
+
+    Returns the same plotly ``Figure`` object for identical params, so
+    re-opening a preview skips the plot transform entirely.
+    """
+    return generate_preview_figure(_steps, EW=EW, EH=EH)
+
+
+def _invalidate_stale_outputs(params_hash: int) -> None:
+    """Drop generated G-code / preview if *params_hash* changed.
+
+    Outputs built from the current params are kept, so reruns triggered by
+    unrelated widgets (or a repeated button click) reuse them as-is.
+    """
+    if st.session_state.params_hash != params_hash:
+        st.session_state.gcode = None
+        st.session_state.preview_fig = None
+        st.session_state.params_hash = params_hash
+
+
+def _throttled_progress(
+    progress, min_interval: float = 0.1
+) -> Callable[[int, int], None]:
+    """Return a ``progress_callback`` that updates the *progress* bar.
+
+    Updates closer together than *min_interval* seconds are dropped (each
+    one is a round-trip to the browser); the final one is always shown.
+    """
+    last_update = 0.0
+
+    def _update(current: int, total: int) -> None:
+        nonlocal last_update
+        now = time.monotonic()
+        if current != total and now - last_update < min_interval:
+            return
+        last_update = now
+        progress.progress(
+            current / total,
+            text=f"Generating band {current} of {total}...",
+        )
+
+    return _update
 
 # ---------------------------------------------------------------------------
 # Session state
@@ -91,8 +209,10 @@ if "gcode" not in st.session_state:
     st.session_state.gcode = None
 if "preview_fig" not in st.session_state:
     st.session_state.preview_fig = None
-if "steps" not in st.session_state:
-    st.session_state.steps = None
+if "params_hash" not in st.session_state:
+    st.session_state.params_hash = None
+if "steps_cache" not in st.session_state:
+    st.session_state.steps_cache = OrderedDict()
 if "stl_data" not in st.session_state:
     st.session_state.stl_data = None
 if "stl_filename" not in st.session_state:
@@ -146,160 +266,166 @@ with st.sidebar:
     show_advanced = st.checkbox("Show advanced settings")
 
     if show_advanced:
-        st.subheader("Design Tuning")
-        total_height = st.number_input(
-            "Band height (mm)", 5.0, 40.0, DEFAULTS["total_height"], step=1.0,
-            help="Total height (Z dimension) of the finished wristband.",
-        )
-        wiggle_amplitude = st.number_input(
-            "Wiggle amplitude", 10.0, 100.0, DEFAULTS["wiggle_amplitude"], step=5.0,
-            help=(
-                "Radial amplitude of the meander pattern. Higher = deeper wiggle, "
-                "more flex in the finished band but also more material."
-            ),
-        )
-        wiggle_frequency = st.number_input(
-            "Wiggle frequency", 20.0, 200.0, DEFAULTS["wiggle_frequency"], step=5.0,
-            help=(
-                "Number of wiggle cycles around the spiral. Higher = tighter, "
-                "finer meander; lower = longer, smoother waves."
-            ),
-        )
-        phase_shift_fraction = st.number_input(
-            "Phase shift per layer (× wiggle wavelength)",
-            -1.0,
-            1.0,
-            DEFAULTS["per_layer_phase_shift"] / (2.0 * math.pi),
-            step=0.005,
-            format="%.4f",
-            help=(
-                "How far the wiggle pattern is advanced between consecutive "
-                "spiral turns, measured in units of the wiggle's own wavelength. "
-                "0 = meanders stack (almost) vertically. ±0.5 = shifted by half a wiggle "
-                "per layer (checkerboard look). ±1 = shifted by a full wavelength "
-                "(visually identical to 0 for the wiggle itself). "
-                "Non-zero values skew the meander pattern diagonally across "
-                "the band — sign controls which way. Note: this is a *phase* "
-                "shift, not the physical tilt angle of the meander columns; "
-                "the visible slant also depends on circumference, wiggle "
-                "frequency, and layer height."
-            ),
-        )
-        per_layer_phase_shift = phase_shift_fraction * 2.0 * math.pi
-        text_size = st.number_input(
-            "Text size", 4.0, float(total_height), min(DEFAULTS["text_size"], float(total_height)), step=1.0,
-            help="Approximate text character height in mm on the side of the band. Capped at band height.",
-        )
-        text_emboss_factor = st.number_input(
-            "Text emboss factor",
-            1.0,
-            3.0,
-            DEFAULTS["text_emboss_factor"],
-            step=0.1,
-            format="%.2f",
-            help=(
-                "Multiplier on the wiggle amplitude at text points — controls how "
-                "far the text stands out from the band. 1.0 = flush, 1.5 = default, "
-                "higher = more pronounced relief."
-            ),
-        )
-        text_vertical_offset = st.number_input(
-            "Text vertical offset (mm)",
-            -float(total_height) / 2.0,
-            float(total_height) / 2.0,
-            float(DEFAULTS["text_vertical_offset"]),
-            step=0.5,
-            format="%.1f",
-            help=(
-                "Shift text up (+) or down (-) from the vertical center of the "
-                "band. 0 = centered."
-            ),
-        )
+        # Batch the advanced inputs: nothing reruns until "Apply settings".
+        with st.form("band_settings"):
+            st.subheader("Design Tuning")
+            total_height = st.number_input(
+                "Band height (mm)", 5.0, 40.0, DEFAULTS["total_height"], step=1.0,
+                help="Total height (Z dimension) of the finished wristband.",
+            )
+            wiggle_amplitude = st.number_input(
+                "Wiggle amplitude", 10.0, 100.0, DEFAULTS["wiggle_amplitude"], step=5.0,
+                help=(
+                    "Radial amplitude of the meander pattern. Higher = deeper wiggle, "
+                    "more flex in the finished band but also more material."
+                ),
+            )
+            wiggle_frequency = st.number_input(
+                "Wiggle frequency", 20.0, 200.0, DEFAULTS["wiggle_frequency"], step=5.0,
+                help=(
+                    "Number of wiggle cycles around the spiral. Higher = tighter, "
+                    "finer meander; lower = longer, smoother waves."
+                ),
+            )
+            phase_shift_fraction = st.number_input(
+                "Phase shift per layer (× wiggle wavelength)",
+                -1.0,
+                1.0,
+                DEFAULTS["per_layer_phase_shift"] * _INV_TWO_PI,
+                step=0.005,
+                format="%.4f",
+                help=(
+                    "How far the wiggle pattern is advanced between consecutive "
+                    "spiral turns, measured in units of the wiggle's own wavelength. "
+                    "0 = meanders stack (almost) vertically. ±0.5 = shifted by half a wiggle "
+                    "per layer (checkerboard look). ±1 = shifted by a full wavelength "
+                    "(visually identical to 0 for the wiggle itself). "
+                    "Non-zero values skew the meander pattern diagonally across "
+                    "the band — sign controls which way. Note: this is a *phase* "
+                    "shift, not the physical tilt angle of the meander columns; "
+                    "the visible slant also depends on circumference, wiggle "
+                    "frequency, and layer height."
+                ),
+            )
+            per_layer_phase_shift = phase_shift_fraction * 2.0 * math.pi
+            text_size = st.number_input(
+                "Text size", 4.0, float(total_height), min(DEFAULTS["text_size"], float(total_height)), step=1.0,
+                help="Approximate text character height in mm on the side of the band. Capped at band height.",
+            )
+            text_emboss_factor = st.number_input(
+                "Text emboss factor",
+                1.0,
+                3.0,
+                DEFAULTS["text_emboss_factor"],
+                step=0.1,
+                format="%.2f",
+                help=(
+                    "Multiplier on the wiggle amplitude at text points — controls how "
+                    "far the text stands out from the band. 1.0 = flush, 1.5 = default, "
+                    "higher = more pronounced relief."
+                ),
+            )
+            text_vertical_offset = st.number_input(
+                "Text vertical offset (mm)",
+                -float(total_height) / 2.0,
+                float(total_height) / 2.0,
+                float(DEFAULTS["text_vertical_offset"]),
+                step=0.5,
+                format="%.1f",
+                help=(
+                    "Shift text up (+) or down (-) from the vertical center of the "
+                    "band. 0 = centered."
+                ),
+            )
+
+            st.subheader("Quality")
+            quality_labels = list(QUALITY_PRESETS.keys())
+            quality_choice = st.selectbox(
+                "Point density", quality_labels, index=1,  # default Standard
+                help=(
+                    "Number of points sampled per spiral. Higher density = smoother "
+                    "curves but slower generation and larger G-code / STL files. "
+                    "The 3D preview may use fewer, but never fewer than "
+                    f"{MIN_SAMPLES_PER_WIGGLE} per meander wiggle."
+                ),
+            )
+            num_points = QUALITY_PRESETS[quality_choice]
+
+            st.subheader("Print Settings")
+            st.caption(
+                "These settings are baked into the **G-code only**. They have no "
+                "effect on STL export — configure those in your slicer instead."
+            )
+            nozzle_temp = st.number_input(
+                "Nozzle temp (C)", 180, 280, DEFAULTS["nozzle_temp"],
+                help="**G-code only.** Hotend temperature. 220 °C is a good TPU starting point; try ~210 °C for softer TPU.",
+            )
+            bed_temp = st.number_input(
+                "Bed temp (C)", 0, 120, DEFAULTS["bed_temp"],
+                help="**G-code only.** Heated-bed temperature. 60 °C works well for TPU on PEI / glass.",
+            )
+            print_speed = st.number_input(
+                "Print speed (mm/min)", 300, 3000, DEFAULTS["print_speed"], step=100,
+                help=(
+                    "**G-code only.** Main travel-over-material speed. 1100 mm/min (~18 mm/s) "
+                    "is a safe TPU default — Bowden extruders may need slower."
+                ),
+            )
+            fan_percent = st.slider(
+                "Fan %", 0, 100, DEFAULTS["fan_percent"],
+                help="**G-code only.** Part-cooling fan duty cycle during printing.",
+            )
+            EW = st.number_input(
+                "Extrusion width (mm)", 0.2, 1.2, DEFAULTS["EW"], step=0.05, format="%.2f",
+                help=(
+                    "**G-code only.** Width of a single extruded line. Typically matches or slightly "
+                    "exceeds the nozzle diameter (0.4 mm nozzle → 0.4–0.5 mm)."
+                ),
+            )
+            EH = st.number_input(
+                "Layer height (mm)", 0.05, 0.4, DEFAULTS["EH"], step=0.05, format="%.2f",
+                help=(
+                    "**G-code only.** Height of each printed layer / spiral pitch. 0.2 mm is the standard "
+                    "default for TPU and also the recommended setting for STL vase mode."
+                ),
+            )
+            ease_in_height = st.number_input(
+                "Ease-in height (mm)",
+                0.0,
+                5.0,
+                DEFAULTS["ease_in_height"],
+                step=0.2,
+                format="%.1f",
+                help=(
+                    "**G-code only.** Bottom region (in mm) where the extrusion width "
+                    "ramps up from reduced → full. Gives the first layers a thinner start. "
+                    "(Has no effect on STL geometry — the slicer "
+                    "controls first-layer width there.)"
+                ),
+            )
+            ease_out_height = st.number_input(
+                "Ease-out height (mm)",
+                0.0,
+                5.0,
+                DEFAULTS["ease_out_height"],
+                step=0.2,
+                format="%.1f",
+                help=(
+                    "**G-code only.** Top region (in mm) where the extrusion width "
+                    "ramps back down, giving the band a cleaner, rounder finishing edge."
+                ),
+            )
+            ease_strength = st.slider(
+                "Ease strength", 0.0, 1.0, DEFAULTS["ease_strength"], step=0.05,
+                help=(
+                    "**G-code only.** How strongly the extrusion width is attenuated "
+                    "in the ease-in/out regions. 0 = full width everywhere, 1 = width "
+                    "tapers to zero at the very ends."
+                ),
+            )
+
+            st.form_submit_button("Apply settings", width="stretch")
 
-        st.subheader("Quality")
-        quality_labels = list(QUALITY_PRESETS.keys())
-        quality_choice = st.selectbox(
-            "Point density", quality_labels, index=1,
-            help=(
-                "Number of points sampled per spiral. Higher density = smoother "
-                "curves but slower generation and larger G-code / STL files."
-            ),
-        )
-        num_points = QUALITY_PRESETS[quality_choice]
-    
-        st.subheader("Print Settings")
-        st.caption(
-            "These settings are baked into the **G-code only**. They have no "
-            "effect on STL export — configure those in your slicer instead."
-        )
-        nozzle_temp = st.number_input(
-            "Nozzle temp (C)", 180, 280, DEFAULTS["nozzle_temp"],
-            help="**G-code only.** Hotend temperature. 220 °C is a good TPU starting point; try ~210 °C for softer TPU.",
-        )
-        bed_temp = st.number_input(
-            "Bed temp (C)", 0, 120, DEFAULTS["bed_temp"],
-            help="**G-code only.** Heated-bed temperature. 60 °C works well for TPU on PEI / glass.",
-        )
-        print_speed = st.number_input(
-            "Print speed (mm/min)", 300, 3000, DEFAULTS["print_speed"], step=100,
-            help=(
-                "**G-code only.** Main travel-over-material speed. 1100 mm/min (~18 mm/s) "
-                "is a safe TPU default — Bowden extruders may need slower."
-            ),
-        )
-        fan_percent = st.slider(
-            "Fan %", 0, 100, DEFAULTS["fan_percent"],
-            help="**G-code only.** Part-cooling fan duty cycle during printing.",
-        )
-        EW = st.number_input(
-            "Extrusion width (mm)", 0.2, 1.2, DEFAULTS["EW"], step=0.05, format="%.2f",
-            help=(
-                "**G-code only.** Width of a single extruded line. Typically matches or slightly "
-                "exceeds the nozzle diameter (0.4 mm nozzle → 0.4–0.5 mm)."
-            ),
-        )
-        EH = st.number_input(
-            "Layer height (mm)", 0.05, 0.4, DEFAULTS["EH"], step=0.05, format="%.2f",
-            help=(
-                "**G-code only.** Height of each printed layer / spiral pitch. 0.2 mm is the standard "
-                "default for TPU and also the recommended setting for STL vase mode."
-            ),
-        )
-        ease_in_height = st.number_input(
-            "Ease-in height (mm)",
-            0.0,
-            5.0,
-            DEFAULTS["ease_in_height"],
-            step=0.2,
-            format="%.1f",
-            help=(
-                "**G-code only.** Bottom region (in mm) where the extrusion width "
-                "ramps up from reduced → full. Gives the first layers a thinner start. "
-                "(Has no effect on STL geometry — the slicer "
-                "controls first-layer width there.)"
-            ),
-        )
-        ease_out_height = st.number_input(
-            "Ease-out height (mm)",
-            0.0,
-            5.0,
-            DEFAULTS["ease_out_height"],
-            step=0.2,
-            format="%.1f",
-            help=(
-                "**G-code only.** Top region (in mm) where the extrusion width "
-                "ramps back down, giving the band a cleaner, rounder finishing edge."
-            ),
-        )
-        ease_strength = st.slider(
-            "Ease strength", 0.0, 1.0, DEFAULTS["ease_strength"], step=0.05,
-            help=(
-                "**G-code only.** How strongly the extrusion width is attenuated "
-                "in the ease-in/out regions. 0 = full width everywhere, 1 = width "
-                "tapers to zero at the very ends."
-            ),
-        )
-        
     else:
         nozzle_temp = DEFAULTS["nozzle_temp"]
         bed_temp = DEFAULTS["bed_temp"]
@@ -352,16 +478,26 @@ with grid_col4:
 
 num_slots = grid_nx * grid_ny
 
-# Build default dataframe for the band list
-default_data = {
-    "Enabled": [True] * num_slots,
-    "Front Text": [text_front] * num_slots,
-    "Back Text": [text_back] * num_slots,
-    "Circumference (mm)": [circumference] * num_slots,
-}
-default_df = pd.DataFrame(default_data)
-default_df.index = range(1, num_slots + 1)
-default_df.index.name = "#"
+
+@st.cache_data(show_spinner=False)
+def _default_band_df(
+    text_front: str, text_back: str, circumference: float, num_slots: int
+) -> pd.DataFrame:
+    """Build the default dataframe for the band list."""
+    df = pd.DataFrame(
+        {
+            "Enabled": [True] * num_slots,
+            "Front Text": [text_front] * num_slots,
+            "Back Text": [text_back] * num_slots,
+            "Circumference (mm)": [circumference] * num_slots,
+        }
+    )
+    df.index = range(1, num_slots + 1)
+    df.index.name = "#"
+    return df
+
+
+default_df = _default_band_df(text_front, text_back, circumference, num_slots)
 
 st.caption(
     f"Grid: **{grid_nx} x {grid_ny}** = {num_slots} slots. "
@@ -393,49 +529,80 @@ band_df = st.data_editor(
 )
 
 # Convert dataframe to spiral_configs (None for disabled rows)
-spiral_configs = []
-for _, row in band_df.iterrows():
-    enabled = bool(row["Enabled"]) if pd.notna(row["Enabled"]) else True
-    if not enabled:
-        spiral_configs.append(None)
-        continue
-    front = str(row["Front Text"]).strip() if pd.notna(row["Front Text"]) else ""
-    back = str(row["Back Text"]).strip() if pd.notna(row["Back Text"]) else ""
-    circ = float(row["Circumference (mm)"]) if pd.notna(row["Circumference (mm)"]) else circumference
-    spiral_configs.append(
-        {"text_front": front, "text_back": back, "circumference": circ}
-    )
+enabled = band_df["Enabled"].fillna(True).astype(bool).tolist()
+fronts = band_df["Front Text"].fillna("").astype(str).str.strip().tolist()
+backs = band_df["Back Text"].fillna("").astype(str).str.strip().tolist()
+circs = band_df["Circumference (mm)"].fillna(circumference).astype(float).tolist()
+spiral_configs = [
+    {"text_front": f, "text_back": b, "circumference": c} if on else None
+    for on, f, b, c in zip(enabled, fronts, backs, circs)
+]
 
-num_active = sum(1 for c in spiral_configs if c is not None)
+num_active = sum(enabled)
 
 # ---------------------------------------------------------------------------
 # Build volume check
 # ---------------------------------------------------------------------------
 vol_x, vol_y, vol_z = get_build_volume(fc_printer_name)
 
-# Estimate grid footprint (conservative: use largest circumference radius)
-active_circs = [
-    c["circumference"] for c in spiral_configs if c is not None
-]
-if active_circs:
-    max_radius = max(active_circs) / (2.0 * math.pi)
-else:
-    max_radius = circumference / (2.0 * math.pi)
 
-# Rough band diameter on the print bed (radius + wiggle amplitude contribution)
-band_diameter = 2 * (max_radius + wiggle_amplitude * 0.02)  # wiggle is cumulative, rough est.
+@st.cache_data(show_spinner=False)
+def _check_footprint(
+    active_circs: tuple,
+    circumference: float,
+    wiggle_amplitude: float,
+    nx: int,
+    ny: int,
+    sx: float,
+    sy: float,
+    vol_x: float,
+    vol_y: float,
+    num_active: int,
+) -> tuple[float, float, bool]:
+    """Estimate the grid footprint and whether it exceeds the build area.
+
+    Returns ``(footprint_x, footprint_y, exceeds)``.
+    """
+    # Conservative: use the largest circumference radius
+    if active_circs:
+        max_radius = max(active_circs) * _INV_TWO_PI
+    else:
+        max_radius = circumference * _INV_TWO_PI
+
+    # Rough band diameter on the print bed (radius + wiggle amplitude contribution)
+    band_diameter = 2 * (max_radius + wiggle_amplitude * 0.02)  # wiggle is cumulative, rough est.
+
+    first_center_x = 40.0
+    first_center_y = 48.0
+
+    if num_active <= 1:
+        footprint_x = band_diameter
+        footprint_y = band_diameter
+    else:
+        footprint_x = first_center_x + (nx - 1) * sx + band_diameter / 2
+        footprint_y = first_center_y + (ny - 1) * sy + band_diameter / 2
 
-first_center_x = 40.0
-first_center_y = 48.0
+    exceeds = num_active > 0 and (footprint_x > vol_x or footprint_y > vol_y)
+    return footprint_x, footprint_y, exceeds
 
-if num_active <= 1:
-    footprint_x = band_diameter
-    footprint_y = band_diameter
-else:
-    footprint_x = first_center_x + (grid_nx - 1) * grid_spacing_x + band_diameter / 2
-    footprint_y = first_center_y + (grid_ny - 1) * grid_spacing_y + band_diameter / 2
 
-if num_active > 0 and (footprint_x > vol_x or footprint_y > vol_y):
+active_circs = tuple(
+    c["circumference"] for c in spiral_configs if c is not None
+)
+footprint_x, footprint_y, footprint_exceeds = _check_footprint(
+    active_circs,
+    circumference,
+    wiggle_amplitude,
+    grid_nx,
+    grid_ny,
+    grid_spacing_x,
+    grid_spacing_y,
+    vol_x,
+    vol_y,
+    num_active,
+)
+
+if footprint_exceeds:
     st.warning(
         f"Grid footprint (~{footprint_x:.0f} x {footprint_y:.0f} mm) "
         f"may exceed printer build area "
@@ -477,80 +644,96 @@ params = build_params(
     grid_spacing_y=grid_spacing_y,
     spiral_configs=spiral_configs,
 )
+params_hash = hash(_params_key(params))
 
 # ---------------------------------------------------------------------------
 # Main area — generate / preview / download
 # ---------------------------------------------------------------------------
-col_left, col_right = st.columns([3, 2])
-
-with col_left:
-    generate_btn = st.button(
-        "Generate G-code",
-        type="primary",
-        width="stretch",
-        disabled=num_active == 0,
-    )
-    preview_btn = st.button(
-        "Show 3D Preview",
-        width="stretch",
-        disabled=num_active == 0,
-    )
-    stl_btn = st.button(
-        "Generate STL",
-        width="stretch",
-        disabled=num_active == 0,
-    )
+@st.fragment
+def _main_actions(
+    params: dict,
+    params_hash: int,
+    num_active: int,
+    EW: float,
+    EH: float,
+    text_front: str,
+    text_back: str,
+) -> None:
+    """Generate / preview / STL buttons, downloads and the preview chart.
+
+    Runs as a fragment: clicking one of its buttons reruns only this
+    function, not the whole script.  Outputs are handed back to later
+    reruns through ``st.session_state``.
+    """
+    col_left, col_right = st.columns([3, 2])
+
+    with col_left:
+        generate_btn = st.button(
+            "Generate G-code",
+            type="primary",
+            width="stretch",
+            disabled=num_active == 0,
+        )
+        preview_btn = st.button(
+            "Show 3D Preview",
+            width="stretch",
+            disabled=num_active == 0,
+        )
+        stl_btn = st.button(
+            "Generate STL",
+            width="stretch",
+            disabled=num_active == 0,
+        )
 
-    if generate_btn:
-        st.session_state.gcode = None
-        st.session_state.preview_fig = None
-        st.session_state.steps = None
+        if generate_btn:
+            _invalidate_stale_outputs(params_hash)
 
-        progress = st.progress(0, text="Generating wristband...")
+        if generate_btn and st.session_state.gcode is not None:
+            st.success("G-code is up to date. Click **Download** below.")
+        elif generate_btn:
+            progress = st.progress(0, text="Generating wristband...")
+            _update_progress = _throttled_progress(progress)
 
-        def _update_progress(current: int, total: int) -> None:
-            progress.progress(
-                current / total,
-                text=f"Generating band {current} of {total}...",
-            )
+            try:
+                steps = _cached_assemble(params, _update_progress)
+                progress.progress(1.0, text="Building G-code...")
+                buf = io.BytesIO()
+                write_gcode(params, buf, steps=steps)
+                gcode_size = buf.tell()
+                # A written-out BytesIO hands its buffer over without a copy
+                st.session_state.gcode = buf.getvalue()
+                progress.empty()
+                st.success(
+                    f"G-code generated ({gcode_size / 1024:.0f} KB, "
+                    f"{num_active} band{'s' if num_active != 1 else ''}). "
+                    "Click **Download** below."
+                )
+            except Exception as exc:
+                progress.empty()
+                st.error(f"Generation failed: {exc}")
+                with st.expander("Details"):
+                    st.exception(exc)
 
-        try:
-            steps = assemble_grid_steps(params, progress_callback=_update_progress)
-            st.session_state.steps = steps
-            progress.progress(1.0, text="Building G-code...")
-            gcode = generate_gcode_string(params)
-            st.session_state.gcode = gcode
-            progress.empty()
-            st.success(
-                f"G-code generated ({len(gcode) / 1024:.0f} KB, "
-                f"{num_active} band{'s' if num_active != 1 else ''}). "
-                "Click **Download** below."
-            )
-        except Exception as exc:
-            progress.empty()
-            st.error(f"Generation failed: {exc}")
-            with st.expander("Details"):
-                st.exception(exc)
+        if preview_btn:
+            _invalidate_stale_outputs(params_hash)
 
-    if preview_btn:
-        if st.session_state.steps is None:
-            st.session_state.preview_fig = None
+        if preview_btn and st.session_state.preview_fig is None:
+            # Preview at the lowest density that keeps the band's shape; the
+            # G-code keeps the selected density.
+            params_preview = {
+                **params,
+                "num_points_per_spiral": preview_num_points(params),
+            }
 
             progress = st.progress(0, text="Generating preview...")
-
-            def _update_preview(current: int, total: int) -> None:
-                progress.progress(
-                    current / total,
-                    text=f"Generating band {current} of {total}...",
-                )
+            _update_preview = _throttled_progress(progress)
 
             try:
-                steps = assemble_grid_steps(
-                    params, progress_callback=_update_preview
-                )
-                st.session_state.steps = steps
+                steps = _cached_assemble(params_preview, _update_preview)
                 progress.progress(1.0, text="Rendering preview...")
-                fig = generate_preview_figure(steps, EW=EW, EH=EH)
+                fig = _cached_preview_figure(
+                    _steps_key(params_preview), EW, EH, steps
+                )
                 st.session_state.preview_fig = fig
                 progress.empty()
             except Exception as exc:
@@ -558,74 +741,61 @@ with col_left:
                 st.error(f"Preview failed: {exc}")
                 with st.expander("Details"):
                     st.exception(exc)
-        else:
-            with st.spinner("Rendering preview..."):
-                try:
-                    fig = generate_preview_figure(
-                        st.session_state.steps, EW=EW, EH=EH
-                    )
-                    st.session_state.preview_fig = fig
-                except Exception as exc:
-                    st.error(f"Preview failed: {exc}")
-                    with st.expander("Details"):
-                        st.exception(exc)
-
-    if stl_btn:
-        st.session_state.stl_data = None
-
-        progress = st.progress(0, text="Generating STL...")
-
-        def _update_stl(current: int, total: int) -> None:
-            progress.progress(
-                current / total,
-                text=f"Generating band {current} of {total}...",
+
+        if stl_btn:
+            st.session_state.stl_data = None
+
+            progress = st.progress(0, text="Generating STL...")
+            _update_stl = _throttled_progress(progress)
+
+            try:
+                stl_bytes, stl_name, stl_mime = generate_stl_export(
+                    params, stride=1, progress_callback=_update_stl
+                )
+                st.session_state.stl_data = stl_bytes
+                st.session_state.stl_filename = stl_name
+                st.session_state.stl_mime = stl_mime
+                progress.empty()
+                st.success(
+                    f"STL generated ({len(stl_bytes) / 1024:.0f} KB, "
+                    f"{num_active} band{'s' if num_active != 1 else ''}). "
+                    "Click **Download** below."
+                )
+            except Exception as exc:
+                progress.empty()
+                st.error(f"STL generation failed: {exc}")
+                with st.expander("Details"):
+                    st.exception(exc)
+
+        if st.session_state.gcode is not None:
+            filename = f"uwr_wristband_{text_front}_{text_back}.gcode"
+            st.download_button(
+                "Download .gcode",
+                data=st.session_state.gcode,
+                file_name=filename,
+                mime="text/plain",
+                width="stretch",
             )
 
-        try:
-            stl_bytes, stl_name, stl_mime = generate_stl_export(
-                params, stride=1, progress_callback=_update_stl
+        if st.session_state.stl_data is not None:
+            st.download_button(
+                "Download .stl" if st.session_state.stl_mime == "application/sla" else "Download .zip (STL)",
+                data=st.session_state.stl_data,
+                file_name=st.session_state.stl_filename,
+                mime=st.session_state.stl_mime,
+                width="stretch",
             )
-            st.session_state.stl_data = stl_bytes
-            st.session_state.stl_filename = stl_name
-            st.session_state.stl_mime = stl_mime
-            progress.empty()
-            st.success(
-                f"STL generated ({len(stl_bytes) / 1024:.0f} KB, "
-                f"{num_active} band{'s' if num_active != 1 else ''}). "
-                "Click **Download** below."
+
+    with col_right:
+        if st.session_state.preview_fig is not None:
+            st.plotly_chart(
+                st.session_state.preview_fig, width="stretch"
             )
-        except Exception as exc:
-            progress.empty()
-            st.error(f"STL generation failed: {exc}")
-            with st.expander("Details"):
-                st.exception(exc)
-
-    if st.session_state.gcode is not None:
-        filename = f"uwr_wristband_{text_front}_{text_back}.gcode"
-        st.download_button(
-            "Download .gcode",
-            data=st.session_state.gcode,
-            file_name=filename,
-            mime="text/plain",
-            width="stretch",
-        )
+        else:
+            st.info("Click **Show 3D Preview** to see the wristband model.")
 
-    if st.session_state.stl_data is not None:
-        st.download_button(
-            "Download .stl" if st.session_state.stl_mime == "application/sla" else "Download .zip (STL)",
-            data=st.session_state.stl_data,
-            file_name=st.session_state.stl_filename,
-            mime=st.session_state.stl_mime,
-            width="stretch",
-        )
 
-with col_right:
-    if st.session_state.preview_fig is not None:
-        st.plotly_chart(
-            st.session_state.preview_fig, width="stretch"
-        )
-    else:
-        st.info("Click **Show 3D Preview** to see the wristband model.")
+_main_actions(params, params_hash, num_active, EW, EH, text_front, text_back)
 
 # ---------------------------------------------------------------------------
 # What is UWR?
@@ -1,10 +1,10 @@
 """UWR Wristband Generator."""
 
 # App version — bump when UI, settings, or non-generation code changes.
-APP_VERSION = "1.5.0"
+APP_VERSION = "1.6.0"
 
 # Generator version — bump when generation logic changes (spiral math, text
 # projection, grid assembly, G-code output).  This is embedded in every
 # generated G-code file so prints can be traced back to the exact generator
 # revision.
-GENERATOR_VERSION = "1.5.0"
+GENERATOR_VERSION = "1.5.1"
@@ -67,6 +67,13 @@ QUALITY_PRESETS = {
     "High (150k points)": 150_000,
 }
 
+# The 3D preview samples fewer points than the G-code where it can, but never
+# fewer than MIN_SAMPLES_PER_WIGGLE per meander wiggle (theta and the radial
+# wiggle are cumulative sums, so undersampling deepens the wiggle rather than
+# just coarsening it) nor fewer than PREVIEW_NUM_POINTS per spiral.
+MIN_SAMPLES_PER_WIGGLE = 10
+PREVIEW_NUM_POINTS = 20_000
+
 MIN_CIRCUMFERENCE = 1.0
 MAX_CIRCUMFERENCE = 250.0
 MAX_TEXT_LENGTH = 20
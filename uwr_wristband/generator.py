@@ -10,47 +10,61 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Callable, List, Optional, Sequence, Tuple
+from functools import lru_cache
+from typing import IO, Callable, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
 from uwr_wristband import GENERATOR_VERSION
-from matplotlib.font_manager import FontProperties
-from matplotlib.textpath import TextPath
-from matplotlib.transforms import Affine2D
-from shapely import contains_xy
-from shapely.affinity import scale
+from shapely import STRtree, contains_xy, prepare
 from shapely.geometry import MultiPolygon, Polygon
 
 import fullcontrol as fc
 
 logger = logging.getLogger(__name__)
 
+# 1 / (2π): multiply by this rather than dividing by 2π in the spiral maths.
+_INV_TWO_PI = 1.0 / (2.0 * math.pi)
+
 
 # ---------------------------------------------------------------------------
 # Text polygons (Y, Z space)
 # ---------------------------------------------------------------------------
 
-def build_text_multipolygon(
-    text: str,
-    font: str,
-    size: float,
-    position: Tuple[float, float],
-    mirror: bool = False,
-) -> MultiPolygon:
-    """Build a shapely MultiPolygon for *text* in (Y, Z) coordinates."""
+def _text_outline(
+    text: str, font: str, size: float
+) -> Tuple[List[np.ndarray], Tuple[float, float, float, float]]:
+    """Render *text* into glyph outline polygons.
+
+    Returns ``(polygons, (x0, y0, width, height))`` in font units, where the
+    second item is the text's bounding box.
+    """
+    # matplotlib is only needed to render text, so it is imported lazily
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextPath
+
     fp = FontProperties(family=font, size=size, weight="bold")
     tp = TextPath((0, 0), text, prop=fp)
 
     bbox = tp.get_extents()
-    width = bbox.width
-    height = bbox.height
+    return tp.to_polygons(), (bbox.x0, bbox.y0, bbox.width, bbox.height)
 
-    transform = Affine2D().translate(
-        position[0] - bbox.x0 - width / 2.0,
-        position[1] - bbox.y0 - height / 2.0,
-    )
-    raw_polys = tp.to_polygons()
+
+@lru_cache(maxsize=32)
+def _text_local_multipolygon(
+    text: str, font: str, size: float
+) -> MultiPolygon:
+    """Glyph MultiPolygon for *text*, centred on its bounding box (memoised).
+
+    Font rendering and hole nesting are the expensive part of building text
+    polygons and only depend on (text, font, size); placement and mirroring
+    are applied afterwards by ``build_text_multipolygon``.
+    """
+    from matplotlib.transforms import Affine2D
+
+    raw_polys, (x0, y0, width, height) = _text_outline(text, font, size)
+
+    transform = Affine2D().translate(-x0 - width / 2.0, -y0 - height / 2.0)
 
     transformed = [transform.transform(p) for p in raw_polys if len(p) >= 3]
     shapely_polys = [Polygon(p) for p in transformed]
@@ -65,21 +79,25 @@ def build_text_multipolygon(
         if poly.is_valid and poly.area > 0
     ]
     valid_polys.sort(key=lambda x: x[1].area, reverse=True)
+    # Spatial index over the rings: each outer only tests the rings whose
+    # bounding boxes it overlaps instead of every other ring.
+    tree = STRtree([poly for _, poly in valid_polys])
 
     for i, outer in valid_polys:
         if i in used:
             continue
         holes = []
-        for j, inner in valid_polys:
+        buffered_outer = outer.buffer(0.0001)
+        candidates = np.sort(tree.query(buffered_outer, predicate="contains"))
+        for k in candidates.tolist():
+            j, inner = valid_polys[k]
             if j == i or j in used:
                 continue
-            buffered_outer = outer.buffer(0.0001)
-            if buffered_outer.contains(inner):
-                coords = list(inner.exterior.coords)
-                if inner.exterior.is_ccw:
-                    coords.reverse()
-                holes.append(coords)
-                used.add(j)
+            coords = list(inner.exterior.coords)
+            if inner.exterior.is_ccw:
+                coords.reverse()
+            holes.append(coords)
+            used.add(j)
 
         used.add(i)
         try:
@@ -94,9 +112,38 @@ def build_text_multipolygon(
             if cleaned.is_valid and cleaned.area > 0:
                 outers.append(cleaned)
 
-    polygon = MultiPolygon(outers)
+    return MultiPolygon(outers)
+
+
+@lru_cache(maxsize=64)
+def build_text_multipolygon(
+    text: str,
+    font: str,
+    size: float,
+    position: Tuple[float, float],
+    mirror: bool = False,
+) -> MultiPolygon:
+    """Build a shapely MultiPolygon for *text* in (Y, Z) coordinates.
+
+    Memoised and returned already prepared, so grid cells sharing a text
+    (e.g. the same back number) build and index its polygon only once.
+    *position* must be hashable (a tuple).
+    """
+    from shapely.affinity import scale, translate
+
+    polygon = translate(
+        _text_local_multipolygon(text, font, size),
+        xoff=position[0],
+        yoff=position[1],
+    )
     if mirror:
         polygon = scale(polygon, xfact=-1, yfact=1, origin="center")
+    prepare(polygon)
+    # The cache is process-wide and Streamlit runs each session's script on
+    # its own thread, so concurrent sessions can share this polygon.  One
+    # query makes GEOS build its lazy point-in-area index now, before the
+    # polygon is returned to any caller.
+    contains_xy(polygon, position[0], position[1])
     return polygon
 
 
@@ -104,10 +151,14 @@ def build_text_multipolygon(
 # Spiral generation (vectorised)
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=32)
 def calculate_scale_factor(
     phi_max: float, wiggle_frequency: float, num_points: int = 10_000
 ) -> float:
-    """Estimate a scale factor so the theta integral covers 2*pi per turn."""
+    """Estimate a scale factor so the theta integral covers 2*pi per turn.
+
+    Memoised: every band of a grid shares the same (phi_max, frequency).
+    """
     t = np.linspace(0.0, 2.0 * np.pi, num_points)
     dt = t[1] - t[0]
     cos_vals = np.cos(phi_max * np.sin(wiggle_frequency * t))
@@ -117,6 +168,98 @@ def calculate_scale_factor(
     return 2.0 * np.pi / integral
 
 
+def _sample_spiral(
+    total_height: float,
+    wiggle_amplitude: float,
+    wiggle_frequency: float,
+    spiral_layer_thickness: float,
+    num_points: int,
+    phi_max: float,
+    start_shift_turns: float,
+    initial_z: float,
+    per_layer_phase_shift: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sample the bare meander spiral as ``(theta, d_r, z_vals)`` arrays.
+
+    Pure numeric kernel with no text or placement logic: *theta* is the
+    running angle, *d_r* the radial wiggle offset and *z_vals* the clamped
+    height of each of the *num_points* samples.
+    """
+    turns = float(total_height) / float(spiral_layer_thickness)
+    t = np.linspace(0.0, turns * 2.0 * np.pi, int(num_points))
+
+    # Decouple "wiggles per turn" from "phase advance per turn".  The raw wiggle
+    # argument is ``effective_freq * t``, so after one turn (Δt = 2π) the phase
+    # advances by ``effective_freq * 2π`` = ``wiggle_frequency * 2π`` +
+    # ``per_layer_phase_shift``.  With per_layer_phase_shift = 0 and integer
+    # wiggle_frequency, meanders align vertically; non-zero values skew the
+    # meander pattern across layers.
+    effective_freq = wiggle_frequency + per_layer_phase_shift * _INV_TWO_PI
+
+    # The passes below are memory-bound, so each array is updated in place
+    # rather than through fresh temporaries.  float32 is not an option here:
+    # the cumulative sums and the wiggle argument need float64 precision.
+    phase = effective_freq * t
+    np.sin(phase, out=phase)
+    phase *= phi_max
+    cos_vals = np.cos(phase)
+    sin_vals = np.sin(phase, out=phase)
+    dt = t[1] - t[0] if len(t) > 1 else 0.0  # uniform grid step
+
+    factor = calculate_scale_factor(phi_max, effective_freq)
+    theta = np.cumsum(cos_vals, out=cos_vals)
+    theta *= factor * dt
+    d_r = np.cumsum(sin_vals, out=sin_vals)
+    d_r *= wiggle_amplitude * dt
+
+    z_shift = start_shift_turns * spiral_layer_thickness
+    z_vals = t
+    z_vals *= _INV_TWO_PI
+    z_vals *= spiral_layer_thickness
+    z_vals += initial_z
+    z_vals -= z_shift
+    np.maximum(z_vals, initial_z, out=z_vals)
+
+    return theta, d_r, z_vals
+
+
+def _mark_inside(
+    mask: np.ndarray,
+    poly: MultiPolygon,
+    theta: np.ndarray,
+    z_vals: np.ndarray,
+    base_radius: float,
+    theta_shift: float,
+) -> None:
+    """OR into *mask* the spiral points that lie inside the text *poly*.
+
+    *poly* lives in (arc length, z) space, with the arc length measured
+    around the axis at θ = π - *theta_shift*, i.e. ``theta_shift = π`` for
+    the front text and ``0`` for the back.  *z_vals* must be non-decreasing,
+    so the text's z-band is a contiguous slice: only that slice is
+    projected, and only points inside the polygon's bounding box are handed
+    to the (prepared) GEOS containment test.  Deduplicating the (arc, z)
+    pairs first would not help: z rises with every point inside the band,
+    so the pairs are already unique.
+    """
+    if poly.is_empty:
+        return
+    minx, miny, maxx, maxy = poly.bounds
+    lo = int(np.searchsorted(z_vals, miny, side="left"))
+    hi = int(np.searchsorted(z_vals, maxy, side="right"))
+    if lo >= hi:
+        return
+
+    arc = theta[lo:hi] + theta_shift
+    arc %= 2.0 * math.pi
+    arc -= math.pi
+    arc *= base_radius
+    z_band = z_vals[lo:hi]
+    idx = np.flatnonzero((arc >= minx) & (arc <= maxx))
+    if idx.size:
+        mask[lo + idx] |= contains_xy(poly, arc[idx], z_band[idx])
+
+
 def generate_spiral_meander_with_side_emboss(
     total_height: float,
     base_radius: float,
@@ -139,10 +282,11 @@ def generate_spiral_meander_with_side_emboss(
     """Generate spiral points as an (N, 3) numpy array with sinusoidal radial wiggle.
 
     Text regions are detected using vectorised ``shapely.contains_xy`` (shapely
-    >= 2.0) instead of per-point ``Polygon.contains(Point(...))``, giving
-    roughly a 10x speed-up for 100k+ points.
+    >= 2.0) on prepared polygons instead of per-point
+    ``Polygon.contains(Point(...))``.
     """
-    # Build text polygons in (Y, Z) space
+    # Build text polygons in (Y, Z) space (cached and prepared)
+    text_position_yz = tuple(text_position_yz)
     text_front_poly = None
     text_back_poly = None
     if text_front:
@@ -156,31 +300,19 @@ def generate_spiral_meander_with_side_emboss(
             text_back, text_font, text_size, text_position_yz, mirror=False
         )
 
-    turns = float(total_height) / float(spiral_layer_thickness)
-    t = np.linspace(0.0, turns * 2.0 * np.pi, int(num_points))
-
-    # Decouple "wiggles per turn" from "phase advance per turn".  The raw wiggle
-    # argument is ``effective_freq * t``, so after one turn (Δt = 2π) the phase
-    # advances by ``effective_freq * 2π`` = ``wiggle_frequency * 2π`` +
-    # ``per_layer_phase_shift``.  With per_layer_phase_shift = 0 and integer
-    # wiggle_frequency, meanders align vertically; non-zero values skew the
-    # meander pattern across layers.
-    effective_freq = wiggle_frequency + per_layer_phase_shift / (2.0 * math.pi)
-
-    cos_vals = np.cos(phi_max * np.sin(effective_freq * t))
-    sin_vals = np.sin(phi_max * np.sin(effective_freq * t))
-    dt = np.gradient(t)
-
-    factor = calculate_scale_factor(phi_max, effective_freq)
-    theta = factor * np.cumsum(cos_vals * dt)
-    d_r = wiggle_amplitude * np.cumsum(sin_vals * dt)
-
+    theta, d_r, z_vals = _sample_spiral(
+        total_height=total_height,
+        wiggle_amplitude=wiggle_amplitude,
+        wiggle_frequency=wiggle_frequency,
+        spiral_layer_thickness=spiral_layer_thickness,
+        num_points=num_points,
+        phi_max=phi_max,
+        start_shift_turns=start_shift_turns,
+        initial_z=initial_z,
+        per_layer_phase_shift=per_layer_phase_shift,
+    )
     cx, cy = center_point
 
-    z_shift = start_shift_turns * spiral_layer_thickness
-    z_vals = (t / (2.0 * math.pi)) * spiral_layer_thickness + initial_z - z_shift
-    z_vals = np.maximum(z_vals, initial_z)
-
     # --- Vectorised text containment via arc-length projection ---
     # Map the spiral's running angle to a signed angle in [-π, π) around
     # two reference axes — the front (θ = 0) and the back (θ = π) — then
@@ -188,35 +320,86 @@ def generate_spiral_meander_with_side_emboss(
     # *around* the band instead of projecting it flat onto the Y axis, so
     # characters stay the correct width anywhere along the circumference
     # and are no longer bounded by the band diameter.
-    theta_front = ((theta + math.pi) % (2.0 * math.pi)) - math.pi
-    theta_back = (theta % (2.0 * math.pi)) - math.pi
-    arc_front = base_radius * theta_front
-    arc_back = base_radius * theta_back
-
-    in_text = np.zeros(len(t), dtype=bool)
+    # Only the points within each text's z-band are projected.
+    in_text = np.zeros(len(theta), dtype=bool)
 
     if text_front_poly is not None:
-        in_text |= contains_xy(text_front_poly, arc_front, z_vals)
+        _mark_inside(
+            in_text, text_front_poly, theta, z_vals, base_radius, math.pi
+        )
 
     if text_back_poly is not None:
-        in_text |= contains_xy(text_back_poly, arc_back, z_vals)
-
-    # Apply text emboss scaling
-    d_r_final = d_r.copy()
-    d_r_final[in_text] *= text_emboss_factor
-
-    r = base_radius + d_r_final
-    x = cx + r * np.cos(theta)
-    y = cy + r * np.sin(theta)
-    z_out = np.maximum(z_vals, initial_z)
+        _mark_inside(
+            in_text, text_back_poly, theta, z_vals, base_radius, 0.0
+        )
 
-    return np.column_stack((x, y, z_out))
+    # Apply text emboss scaling (d_r is a fresh array, scale it in place)
+    d_r[in_text] *= text_emboss_factor
+
+    # Write x, y, z straight into the (N, 3) result rather than building
+    # three arrays and stacking them into a fresh one afterwards.
+    r = d_r
+    r += base_radius
+    out = np.empty((len(theta), 3))
+    x, y = out[:, 0], out[:, 1]
+    np.cos(theta, out=x)
+    x *= r
+    x += cx
+    np.sin(theta, out=y)
+    y *= r
+    y += cy
+    # z_vals is already clamped to initial_z by _sample_spiral
+    out[:, 2] = z_vals
+    return out
 
 
 # ---------------------------------------------------------------------------
 # Convert points into fullcontrol steps
 # ---------------------------------------------------------------------------
 
+def _compute_widths_and_transitions(
+    z_arr: np.ndarray,
+    initial_z: float,
+    usable_height: float,
+    EW: float,
+    ease_in_height: float,
+    ease_out_height: float,
+    ease_strength: float,
+    startup_height: float,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Per-point extrusion widths and the indices where print state changes.
+
+    Returns ``(widths, width_idx, startup_idx)``: the eased widths rounded to
+    4 decimals, the indices where the width differs from the previous point
+    (always including 0), and the first index at or above *startup_height*
+    (``-1`` if none is).
+    """
+    rel_z = np.clip(z_arr - initial_z, 0.0, usable_height)
+
+    # The cosine ease is only evaluated inside the ease ranges.  The ease-in
+    # range is applied last so it wins where both ranges overlap.
+    widths = np.full(len(rel_z), float(EW))
+    if ease_out_height > 0:
+        mask = rel_z > (usable_height - ease_out_height)
+        t = (usable_height - rel_z[mask]) / float(ease_out_height)
+        ease_val = 0.5 * (1 - np.cos(np.pi * t))
+        widths[mask] = EW * (1 - ease_strength + ease_strength * ease_val)
+    if ease_in_height > 0:
+        mask = rel_z < ease_in_height
+        t = rel_z[mask] / float(ease_in_height)
+        ease_val = 0.5 * (1 - np.cos(np.pi * t))
+        widths[mask] = EW * (1 - ease_strength + ease_strength * ease_val)
+    widths = np.round(widths, 4)
+
+    width_idx = np.flatnonzero(np.diff(widths)) + 1
+    if len(widths):
+        width_idx = np.concatenate(([0], width_idx))
+
+    past_startup = rel_z >= startup_height
+    startup_idx = int(np.argmax(past_startup)) if past_startup.any() else -1
+    return widths, width_idx, startup_idx
+
+
 def build_steps_from_points(
     spiral_points,
     EW: float,
@@ -244,49 +427,192 @@ def build_steps_from_points(
         fc.Printer(print_speed=print_speed * reduced_print_speed_factor)
     )
 
-    pts_array = np.asarray(spiral_points)
-    usable_height = max(0.0, float(pts_array[:, 2].max()))
-    current_width = None
-    current_fan = reduced_fan_percent
-    current_speed = print_speed * reduced_print_speed_factor
-
-    for pt in spiral_points:
-        z = pt[2]
-        if z <= initial_z:
-            z = initial_z
-        rel_z = min(max(z - initial_z, 0.0), usable_height)
+    pts_array = np.asarray(spiral_points, dtype=float)
+    # Spiral z never decreases along the path, so the last point is the top
+    usable_height = max(0.0, float(pts_array[-1, 2]))
+    z_arr = np.maximum(pts_array[:, 2], initial_z)
+    widths, width_idx, startup_idx = _compute_widths_and_transitions(
+        z_arr,
+        initial_z=initial_z,
+        usable_height=usable_height,
+        EW=EW,
+        ease_in_height=ease_in_height,
+        ease_out_height=ease_out_height,
+        ease_strength=ease_strength,
+        startup_height=startup_height,
+    )
 
-        if rel_z >= startup_height:
-            if current_fan != fan_percent:
+    # Only emit state-changing steps where the state actually changes: at
+    # each width transition and at the first point past the startup height.
+    # The points in between are emitted in bulk.
+    reduced_speed = print_speed * reduced_print_speed_factor
+    if reduced_fan_percent == fan_percent and reduced_speed == print_speed:
+        startup_idx = -1  # nothing switches at the startup height
+    width_starts = set(width_idx.tolist())
+    breaks = set(width_starts)
+    if startup_idx >= 0:
+        breaks.add(startup_idx)
+    bounds = sorted(breaks)
+    bounds.append(len(widths))
+
+    xs = pts_array[:, 0].tolist()
+    ys = pts_array[:, 1].tolist()
+    zs = z_arr.tolist()
+    width_list = widths.tolist()
+
+    for start, stop in zip(bounds, bounds[1:]):
+        if start == startup_idx:
+            if reduced_fan_percent != fan_percent:
                 local_steps.append(fc.Fan(speed_percent=fan_percent))
-                current_fan = fan_percent
-            if current_speed != print_speed:
+            if reduced_speed != print_speed:
                 local_steps.append(fc.Printer(print_speed=print_speed))
-                current_speed = print_speed
-
-        width = EW
-        if ease_in_height > 0 and rel_z < ease_in_height:
-            t = rel_z / float(ease_in_height)
-            ease_val = 0.5 * (1 - math.cos(math.pi * t))
-            width = EW * (1 - ease_strength + ease_strength * ease_val)
-        elif ease_out_height > 0 and rel_z > (usable_height - ease_out_height):
-            dist_from_end = usable_height - rel_z
-            t = dist_from_end / float(ease_out_height)
-            ease_val = 0.5 * (1 - math.cos(math.pi * t))
-            width = EW * (1 - ease_strength + ease_strength * ease_val)
-
-        w_rounded = round(width, 4)
-        if w_rounded != current_width:
-            local_steps.append(fc.ExtrusionGeometry(width=w_rounded, height=EH))
-            current_width = w_rounded
-
-        local_steps.append(fc.Point(x=pt[0], y=pt[1], z=z))
+        if start in width_starts:
+            local_steps.append(
+                fc.ExtrusionGeometry(width=width_list[start], height=EH)
+            )
+        local_steps.extend([
+            fc.Point(x=x, y=y, z=z)
+            for x, y, z in zip(xs[start:stop], ys[start:stop], zs[start:stop])
+        ])
 
     local_steps.append(fc.Extruder(on=False))
     local_steps.append(fc.StationaryExtrusion(volume=-1.5, speed=250))
     return local_steps
 
 
+# ---------------------------------------------------------------------------
+# Per-band sampling (cached) and grid placement
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=32)
+def _sample_band_cached(
+    total_height: float,
+    base_radius: float,
+    wiggle_amplitude: float,
+    wiggle_frequency: float,
+    spiral_layer_thickness: float,
+    text_front: Optional[str],
+    text_back: Optional[str],
+    text_font: str,
+    text_size: float,
+    text_position_yz: Tuple[float, float],
+    text_emboss_factor: float,
+    num_points: int,
+    phi_max: float,
+    start_shift_turns: float,
+    initial_z: float,
+    per_layer_phase_shift: float,
+) -> np.ndarray:
+    """Spiral points of one band centred on the origin (memoised).
+
+    Bands are independent of each other and of their grid position, so an
+    edit to one row of the band table only resamples that band.  The cached
+    array is shared between callers and therefore marked read-only.
+    """
+    pts = generate_spiral_meander_with_side_emboss(
+        total_height=total_height,
+        base_radius=base_radius,
+        wiggle_amplitude=wiggle_amplitude,
+        wiggle_frequency=wiggle_frequency,
+        spiral_layer_thickness=spiral_layer_thickness,
+        center_point=(0.0, 0.0),
+        text_front=text_front,
+        text_back=text_back,
+        text_font=text_font,
+        text_size=text_size,
+        text_position_yz=text_position_yz,
+        text_emboss_factor=text_emboss_factor,
+        num_points=num_points,
+        phi_max=phi_max,
+        start_shift_turns=start_shift_turns,
+        initial_z=initial_z,
+        per_layer_phase_shift=per_layer_phase_shift,
+    )
+    pts.setflags(write=False)
+    return pts
+
+
+def _cached_band_points(params: dict, config: dict) -> np.ndarray:
+    """Cached spiral points for the band *config*, centred on the origin.
+
+    Resolves *params* / *config* into the keyword arguments of the memoised
+    kernel ``_sample_band_cached``; call this rather than the kernel.
+    """
+    circ = config.get("circumference", params["circumference"])
+    front_text = config.get("text_front", params["text_front"])
+    back_text = config.get("text_back", params["text_back"])
+
+    if back_text is not None:
+        back_text = str(back_text)
+
+    return _sample_band_cached(
+        total_height=params["total_height"],
+        base_radius=circ * _INV_TWO_PI,
+        wiggle_amplitude=params["wiggle_amplitude"],
+        wiggle_frequency=params["wiggle_frequency"],
+        spiral_layer_thickness=params["spiral_layer_thickness"],
+        text_front=front_text,
+        text_back=back_text,
+        text_font=params.get("text_font", "DejaVu Sans"),
+        text_size=params.get("text_size", 1.0),
+        text_position_yz=tuple(params.get("text_position_yz", (0.0, 0.0))),
+        text_emboss_factor=params.get("text_emboss_factor", 1.6),
+        num_points=params.get("num_points_per_spiral", 100_000),
+        phi_max=params.get("phi_max", math.pi * 0.59),
+        start_shift_turns=params.get("start_shift_turns", 1.0),
+        initial_z=params.get("initial_z", 0.14),
+        per_layer_phase_shift=params.get("per_layer_phase_shift", 0.0),
+    )
+
+
+def _build_bands_local_frame(
+    params: dict,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[Tuple[int, int, int, dict, np.ndarray]]:
+    """Sample every active grid slot in its local (origin-centred) frame.
+
+    Returns ``(idx, ix, iy, config, local_points)`` per active slot, in
+    print order.  Only the band geometry is involved here — grid position
+    and spacing are applied afterwards by ``_place_bands``.
+    """
+    grid_nx = params["grid_nx"]
+    grid_ny = params["grid_ny"]
+    spiral_configs = params.get("spiral_configs", [])
+
+    cells = [
+        (idx, idx % grid_nx, idx // grid_nx, spiral_configs[idx])
+        for idx in range(min(grid_nx * grid_ny, len(spiral_configs)))
+        if spiral_configs[idx] is not None
+    ]
+
+    bands: List[Tuple[int, int, int, dict, np.ndarray]] = []
+    for completed, (idx, ix, iy, config) in enumerate(cells, start=1):
+        local = _cached_band_points(params, config)
+        bands.append((idx, ix, iy, config, local))
+        if progress_callback is not None:
+            progress_callback(completed, len(cells))
+    return bands
+
+
+def _place_bands(
+    local_bands: List[Tuple[int, int, int, dict, np.ndarray]],
+    grid_first_center: Tuple[float, float],
+    grid_spacing: Tuple[float, float],
+) -> List[Tuple[int, int, int, dict, np.ndarray, Tuple[float, float]]]:
+    """Translate local-frame bands onto their grid positions.
+
+    Returns ``(idx, ix, iy, config, points, (cx, cy))`` per band.  This is a
+    plain vector add, so changing the grid spacing never resamples a band.
+    """
+    placed = []
+    for idx, ix, iy, config, local in local_bands:
+        cx = grid_first_center[0] + ix * grid_spacing[0]
+        cy = grid_first_center[1] + iy * grid_spacing[1]
+        pts = local + np.array([cx, cy, 0.0])
+        placed.append((idx, ix, iy, config, pts, (cx, cy)))
+    return placed
+
+
 # ---------------------------------------------------------------------------
 # Grid assembly
 # ---------------------------------------------------------------------------
@@ -300,125 +626,84 @@ def assemble_grid_steps(
     ``progress_callback(current, total)`` is called after each spiral so the
     caller can update a progress bar.
     """
-    grid_first_center = params["grid_first_center"]
-    grid_nx = params["grid_nx"]
-    grid_ny = params["grid_ny"]
-    grid_spacing = params["grid_spacing"]
     spiral_configs = params.get("spiral_configs", [])
-
-    total_spirals = sum(
-        1
-        for idx in range(grid_nx * grid_ny)
-        if idx < len(spiral_configs) and spiral_configs[idx] is not None
+    bands = _place_bands(
+        _build_bands_local_frame(params),
+        params["grid_first_center"],
+        params["grid_spacing"],
     )
+    total_spirals = len(bands)
+
+    # next_circ_from[i]: circumference of the first active slot at index
+    # >= i, filled in one right-to-left pass (the default if there is none)
+    default_circ = params["circumference"]
+    next_circ_from = [default_circ] * (len(spiral_configs) + 1)
+    for i in range(len(spiral_configs) - 1, -1, -1):
+        config = spiral_configs[i]
+        next_circ_from[i] = (
+            next_circ_from[i + 1]
+            if config is None
+            else config.get("circumference", default_circ)
+        )
 
     steps: List = []
-    spiral_index = 0
-    completed = 0
-    for iy in range(grid_ny):
-        for ix in range(grid_nx):
-            idx = spiral_index
-            spiral_index += 1
-
-            if idx >= len(spiral_configs) or spiral_configs[idx] is None:
-                continue
-
-            config = spiral_configs[idx]
-            cx = grid_first_center[0] + ix * grid_spacing[0]
-            cy = grid_first_center[1] + iy * grid_spacing[1]
-
-            circ = config.get("circumference", params["circumference"])
-            front_text = config.get("text_front", params["text_front"])
-            back_text = config.get("text_back", params["text_back"])
-
-            if back_text is not None:
-                back_text = str(back_text)
-
-            base_r = circ / (2.0 * math.pi)
-
-            pts = generate_spiral_meander_with_side_emboss(
-                total_height=params["total_height"],
-                base_radius=base_r,
-                wiggle_amplitude=params["wiggle_amplitude"],
-                wiggle_frequency=params["wiggle_frequency"],
-                spiral_layer_thickness=params["spiral_layer_thickness"],
-                center_point=(cx, cy),
-                text_front=front_text,
-                text_back=back_text,
-                text_font=params.get("text_font", "DejaVu Sans"),
-                text_size=params.get("text_size", 1.0),
-                text_position_yz=params.get("text_position_yz", (0.0, 0.0)),
-                text_emboss_factor=params.get("text_emboss_factor", 1.6),
-                num_points=params.get("num_points_per_spiral", 100_000),
-                phi_max=params.get("phi_max", math.pi * 0.59),
-                start_shift_turns=params.get("start_shift_turns", 1.0),
-                initial_z=params.get("initial_z", 0.14),
-                per_layer_phase_shift=params.get("per_layer_phase_shift", 0.0),
-            )
-
-            local = build_steps_from_points(
-                spiral_points=pts,
-                EW=params["EW"],
-                EH=params["EH"],
-                initial_z=params["initial_z"],
-                reduced_fan_percent=params["reduced_fan_percent"],
-                reduced_print_speed_factor=params["reduced_print_speed_factor"],
-                print_speed=params["print_speed"],
-                fan_percent=params["fan_percent"],
-                ease_in_height=params["ease_in_height"],
-                ease_out_height=params["ease_out_height"],
-                ease_strength=params["ease_strength"],
-                startup_height=params["startup_height"],
-            )
+    for completed, (idx, ix, iy, config, pts, (cx, cy)) in enumerate(
+        bands, start=1
+    ):
+        local = build_steps_from_points(
+            spiral_points=pts,
+            EW=params["EW"],
+            EH=params["EH"],
+            initial_z=params["initial_z"],
+            reduced_fan_percent=params["reduced_fan_percent"],
+            reduced_print_speed_factor=params["reduced_print_speed_factor"],
+            print_speed=params["print_speed"],
+            fan_percent=params["fan_percent"],
+            ease_in_height=params["ease_in_height"],
+            ease_out_height=params["ease_out_height"],
+            ease_strength=params["ease_strength"],
+            startup_height=params["startup_height"],
+        )
 
-            local.append(fc.Printer(print_speed=params["print_speed"]))
-            local.append(fc.Fan(speed_percent=params["fan_percent"]))
-            steps.extend(local)
+        local.append(fc.Printer(print_speed=params["print_speed"]))
+        local.append(fc.Fan(speed_percent=params["fan_percent"]))
+        steps.extend(local)
 
-            steps.append(fc.Extruder(on=False))
-            steps.append(fc.Point(x=cx, y=cy, z=params["safe_z"]))
+        steps.append(fc.Extruder(on=False))
+        steps.append(fc.Point(x=cx, y=cy, z=params["safe_z"]))
 
-            is_last = (
-                iy == params["grid_ny"] - 1 and ix == params["grid_nx"] - 1
+        is_last = (
+            iy == params["grid_ny"] - 1 and ix == params["grid_nx"] - 1
+        )
+        if not is_last:
+            if ix < (params["grid_nx"] - 1):
+                next_ix, next_iy = ix + 1, iy
+            else:
+                next_ix, next_iy = 0, iy + 1
+
+            next_idx = idx + 1
+            next_cx = (
+                params["grid_first_center"][0]
+                + next_ix * params["grid_spacing"][0]
+            )
+            next_cy = (
+                params["grid_first_center"][1]
+                + next_iy * params["grid_spacing"][1]
             )
-            if not is_last:
-                if ix < (params["grid_nx"] - 1):
-                    next_ix, next_iy = ix + 1, iy
-                else:
-                    next_ix, next_iy = 0, iy + 1
-
-                next_idx = idx + 1
-                next_cx = (
-                    params["grid_first_center"][0]
-                    + next_ix * params["grid_spacing"][0]
-                )
-                next_cy = (
-                    params["grid_first_center"][1]
-                    + next_iy * params["grid_spacing"][1]
-                )
 
-                next_circ = params["circumference"]
-                for check_idx in range(next_idx, len(spiral_configs)):
-                    if spiral_configs[check_idx] is not None:
-                        next_circ = spiral_configs[check_idx].get(
-                            "circumference", next_circ
-                        )
-                        break
-
-                next_base_r = next_circ / (2.0 * math.pi)
-                next_start_x = next_cx + next_base_r
-                next_start_y = next_cy
-                steps.append(
-                    fc.Point(
-                        x=next_start_x,
-                        y=next_start_y,
-                        z=params["safe_z"],
-                    )
+            next_base_r = next_circ_from[next_idx] * _INV_TWO_PI
+            next_start_x = next_cx + next_base_r
+            next_start_y = next_cy
+            steps.append(
+                fc.Point(
+                    x=next_start_x,
+                    y=next_start_y,
+                    z=params["safe_z"],
                 )
+            )
 
-            completed += 1
-            if progress_callback is not None:
-                progress_callback(completed, total_spirals)
+        if progress_callback is not None:
+            progress_callback(completed, total_spirals)
 
     return steps
 
@@ -427,6 +712,18 @@ def assemble_grid_steps(
 # High-level convenience functions
 # ---------------------------------------------------------------------------
 
+# Version header prepended to every G-code file so prints can be traced to
+# the generator revision.  Built (and encoded) once at import time.
+_GCODE_HEADER = (
+    f"; UWR Wristband Generator — generator version {GENERATOR_VERSION}\n"
+    "; https://github.com/gruensil/gcode_wristbands\n"
+)
+_GCODE_HEADER_BYTES = _GCODE_HEADER.encode("utf-8")
+
+# Size (characters) of the body slices yielded by ``generate_gcode_stream``.
+_GCODE_CHUNK_CHARS = 1 << 20
+
+
 def build_params(
     *,
     text_front: str = "SILERS",
@@ -522,6 +819,24 @@ def build_params(
     return params
 
 
+def preview_num_points(params: dict) -> int:
+    """Points per spiral to use for the 3D preview of *params*.
+
+    At most the G-code density, and at least ``MIN_SAMPLES_PER_WIGGLE``
+    samples per meander wiggle (and ``PREVIEW_NUM_POINTS``), so the preview
+    keeps the shape of the band that will be printed.
+    """
+    from .defaults import MIN_SAMPLES_PER_WIGGLE, PREVIEW_NUM_POINTS
+
+    turns = params["total_height"] / params["spiral_layer_thickness"]
+    wiggles_per_turn = (
+        params["wiggle_frequency"]
+        + params.get("per_layer_phase_shift", 0.0) * _INV_TWO_PI
+    )
+    needed = math.ceil(MIN_SAMPLES_PER_WIGGLE * abs(wiggles_per_turn) * turns)
+    return min(params["num_points_per_spiral"], max(PREVIEW_NUM_POINTS, needed))
+
+
 def generate_band_arrays(
     params: dict,
     progress_callback: Optional[Callable[[int, int], None]] = None,
@@ -532,78 +847,16 @@ def generate_band_arrays(
     is an (N, 3) numpy array, *center_xy* is the cylinder axis center, and
     *config* is the band's spiral_config dict.
     """
-    grid_first_center = params["grid_first_center"]
-    grid_nx = params["grid_nx"]
-    grid_ny = params["grid_ny"]
-    grid_spacing = params["grid_spacing"]
-    spiral_configs = params.get("spiral_configs", [])
-
-    total_spirals = sum(
-        1
-        for idx in range(grid_nx * grid_ny)
-        if idx < len(spiral_configs) and spiral_configs[idx] is not None
+    bands = _place_bands(
+        _build_bands_local_frame(params, progress_callback=progress_callback),
+        params["grid_first_center"],
+        params["grid_spacing"],
     )
+    return [(pts, center, config) for _, _, _, config, pts, center in bands]
 
-    results: List[Tuple[np.ndarray, Tuple[float, float], dict]] = []
-    spiral_index = 0
-    completed = 0
-    for iy in range(grid_ny):
-        for ix in range(grid_nx):
-            idx = spiral_index
-            spiral_index += 1
-
-            if idx >= len(spiral_configs) or spiral_configs[idx] is None:
-                continue
-
-            config = spiral_configs[idx]
-            cx = grid_first_center[0] + ix * grid_spacing[0]
-            cy = grid_first_center[1] + iy * grid_spacing[1]
-
-            circ = config.get("circumference", params["circumference"])
-            front_text = config.get("text_front", params["text_front"])
-            back_text = config.get("text_back", params["text_back"])
-
-            if back_text is not None:
-                back_text = str(back_text)
-
-            base_r = circ / (2.0 * math.pi)
-
-            pts = generate_spiral_meander_with_side_emboss(
-                total_height=params["total_height"],
-                base_radius=base_r,
-                wiggle_amplitude=params["wiggle_amplitude"],
-                wiggle_frequency=params["wiggle_frequency"],
-                spiral_layer_thickness=params["spiral_layer_thickness"],
-                center_point=(cx, cy),
-                text_front=front_text,
-                text_back=back_text,
-                text_font=params.get("text_font", "DejaVu Sans"),
-                text_size=params.get("text_size", 1.0),
-                text_position_yz=params.get("text_position_yz", (0.0, 0.0)),
-                text_emboss_factor=params.get("text_emboss_factor", 1.6),
-                num_points=params.get("num_points_per_spiral", 100_000),
-                phi_max=params.get("phi_max", math.pi * 0.59),
-                start_shift_turns=params.get("start_shift_turns", 1.0),
-                initial_z=params.get("initial_z", 0.14),
-                per_layer_phase_shift=params.get("per_layer_phase_shift", 0.0),
-            )
-
-            results.append((pts, (cx, cy), config))
-
-            completed += 1
-            if progress_callback is not None:
-                progress_callback(completed, total_spirals)
-
-    return results
-
-
-def generate_gcode_string(
-    params: dict,
-    progress_callback: Optional[Callable[[int, int], None]] = None,
-) -> str:
-    """Generate G-code as a string (no file written to disk)."""
-    steps = assemble_grid_steps(params, progress_callback=progress_callback)
 
+def _transform_gcode(params: dict, steps: List) -> str:
+    """Run fullcontrol's G-code transform over *steps* for *params*."""
     gcode_controls = fc.GcodeControls(
         printer_name=params["printer_name"],
         save_as=None,
@@ -617,12 +870,62 @@ def generate_gcode_string(
             "extrusion_height": params["EH"],
         },
     )
+    return fc.transform(steps, "gcode", gcode_controls, show_tips=False)
 
-    gcode = fc.transform(steps, "gcode", gcode_controls, show_tips=False)
 
-    # Prepend a version header so prints can be traced to the generator revision.
-    header = (
-        f"; UWR Wristband Generator — generator version {GENERATOR_VERSION}\n"
-        f"; https://github.com/gruensil/gcode_wristbands\n"
-    )
-    return header + gcode
+def generate_gcode_stream(
+    params: dict,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    steps: Optional[List] = None,
+) -> Iterator[bytes]:
+    """Yield UTF-8 encoded G-code: the header, then ~1 MB body chunks.
+
+    fullcontrol tracks extruder and printer state across the whole steps
+    list, so the body is produced by one transform as a single ``str``;
+    only its encoding is done chunk by chunk, so no full-size encoded copy
+    is built next to it.  Steps assembled here are dropped before the chunks
+    are yielded; steps passed in by the caller stay alive with the caller.
+    *steps* and *progress_callback* behave as in ``generate_gcode_string``.
+    """
+    if steps is None:
+        steps = assemble_grid_steps(params, progress_callback=progress_callback)
+
+    yield _GCODE_HEADER_BYTES
+    body = _transform_gcode(params, steps)
+    del steps
+    for start in range(0, len(body), _GCODE_CHUNK_CHARS):
+        yield body[start:start + _GCODE_CHUNK_CHARS].encode("utf-8")
+
+
+def write_gcode(
+    params: dict,
+    buf: IO[bytes],
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    steps: Optional[List] = None,
+) -> int:
+    """Write the chunks of ``generate_gcode_stream`` to the binary *buf*.
+
+    Returns the number of bytes written.
+    """
+    written = 0
+    for chunk in generate_gcode_stream(
+        params, progress_callback=progress_callback, steps=steps
+    ):
+        written += buf.write(chunk)
+    return written
+
+
+def generate_gcode_string(
+    params: dict,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    steps: Optional[List] = None,
+) -> str:
+    """Generate G-code as a string (no file written to disk).
+
+    Pass pre-assembled *steps* (from ``assemble_grid_steps(params)``) to
+    skip the spiral generation; ``progress_callback`` is then unused.
+    """
+    if steps is None:
+        steps = assemble_grid_steps(params, progress_callback=progress_callback)
+
+    return _GCODE_HEADER + _transform_gcode(params, steps)
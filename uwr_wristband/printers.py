@@ -62,6 +62,7 @@ def get_all_printer_options() -> Tuple[Tuple[str, str], ...]:
     return tuple(options)
 
 
+@lru_cache(maxsize=1)
 def default_printer_index() -> int:
     """Return the index of the default printer (Anycubic Kobra 3) in the
     options list."""